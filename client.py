@@ -1,23 +1,83 @@
 #!/usr/bin/env python
 # client.py
+import argparse
+import os
 import socket
+import sys
+import threading
+
+IOV_MAX = 1024  # Most buffers the kernel accepts in a single sendmsg call
+
+def read_acknowledgments(client_socket):
+    """
+    Writes acknowledgments from the server to stdout as they arrive.
+    Used in pipelined mode, where the sender does not wait for them.
+    """
+    while data := client_socket.recv(4096):
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+
+def send_lines(client_socket, lines):
+    """Sends newline-terminated lines with as few sendmsg calls as possible."""
+    for start in range(0, len(lines), IOV_MAX):
+        fragments = [line + b"\n" for line in lines[start:start + IOV_MAX]]
+        sent = client_socket.sendmsg(fragments)
+        total = sum(len(fragment) for fragment in fragments)
+        if sent < total:
+            client_socket.sendall(b"".join(fragments)[sent:])  # Finish a partial send
+
+def run_pipelined(client_socket):
+    """
+    Sends messages from stdin without waiting for each acknowledgment.
+    Every line already available on stdin is batched into one sendmsg call.
+    """
+    reader = threading.Thread(target=read_acknowledgments, args=(client_socket,), daemon=True)
+    reader.start()
+
+    pending = b""
+    while chunk := os.read(sys.stdin.fileno(), 65536):
+        *lines, pending = (pending + chunk).split(b"\n")
+        for index, line in enumerate(lines):
+            if line.strip().lower() == b"exit":
+                send_lines(client_socket, lines[:index + 1])
+                reader.join()  # Server closes the connection after exit
+                return
+        send_lines(client_socket, lines)
+    if pending:
+        send_lines(client_socket, [pending])
+
+    client_socket.shutdown(socket.SHUT_WR)  # No more messages; wait for outstanding acknowledgments
+    reader.join()
+
+def run_interactive(client_socket):
+    """Sends one message at a time and waits for its acknowledgment."""
+    print("Client: Connected to server. Type your messages. Type 'exit' to quit.")
+    while True:
+        msg = input("Client: Enter message: ")
+        client_socket.sendall(f"{msg}\n".encode())
+        if msg.lower() == "exit":
+            break
+        # Receive acknowledgment from the server
+        data = client_socket.recv(1024).decode()
+        print("Server:", data.strip())
 
 def main():
+    parser = argparse.ArgumentParser(description="Send messages to the socket IPC server.")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="send stdin lines without waiting for each acknowledgment")
+    args = parser.parse_args()
+
     host = "localhost"
     port = 12345
     client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
     client_socket.connect((host, port))
-    print("Client: Connected to server. Type your messages. Type 'exit' to quit.")
 
     try:
-        while True:
-            msg = input("Client: Enter message: ")
-            client_socket.sendall(msg.encode())
-            if msg.lower() == "exit":
-                break
-            # Receive acknowledgment from the server
-            data = client_socket.recv(1024).decode()
-            print("Server:", data.strip())
+        if args.pipeline:
+            run_pipelined(client_socket)
+        else:
+            run_interactive(client_socket)
     except KeyboardInterrupt:
         print("Client: Interrupted. Exiting.")
     finally:
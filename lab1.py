@@ -1,15 +1,53 @@
+import asyncio
+import atexit
+import functools
+import heapq
+import logging
+import logging.handlers
+import os
+import queue
+import select
+import selectors
 import socket
 import ssl
+import struct
+import sys
 import threading
 import psutil
 import time
 
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_TIMEOUT = 10  # Seconds without a heartbeat before a slave is unresponsive
+RESOURCE_SAMPLE_INTERVAL = 2  # Seconds over which the sampler thread measures CPU usage
+FRAME = struct.Struct("<BBBB")  # Wire frame: tag, CPU %, memory %, sequence number (mod 256)
+TAG_HB_RES = 1  # Frame tag for a heartbeat carrying resource status
+FLUSH_INTERVAL = 0.1  # Maximum seconds a buffered write waits before being sent
+FLUSH_THRESHOLD = 16000  # Buffered bytes that trigger an immediate send (fits one 16 KiB TLS record)
+TLS_RECORD_SIZE = 16384  # Largest TLS record payload; the master reads up to one record at a time
+
+# Function to route log records through a queue
+# - Records are written to stdout by a listener thread, so handlers never block on the stdout lock
+def setup_logging(level=logging.INFO):
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+    listener.start()
+    atexit.register(listener.stop)  # Flush queued records on exit
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(level)
+    return listener
+
 # Function to create an SSL context for secure communication
-# - For the master node: Loads server certificate and key
+# - For the master node: Loads server certificate and key, and only accepts TLS 1.3
+#   (AES-GCM / ChaCha20 suites, 1-RTT handshakes and session tickets for resumption)
 # - For the slave node: Disables hostname verification for testing purposes
+# The context is built once per side and shared by every connection in the process.
+@functools.lru_cache(maxsize=None)
 def create_ssl_context(server=True):
     if server:
         context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.minimum_version = ssl.TLSVersion.TLSv1_3
         context.load_cert_chain(certfile="server.crt", keyfile="server.key")
     else:
         context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
@@ -19,124 +57,217 @@ def create_ssl_context(server=True):
 
 # Master Node Class
 class MasterNode:
-    def __init__(self, host, port):
+    def __init__(self, host, port, cpu=None):
         self.host = host
         self.port = port
+        self.cpu = cpu  # CPU to pin the event loop thread to (Linux only); None leaves scheduling to the OS
         self.slaves = {}  # Dictionary to track connected slaves and last heartbeat time
-        self.lock = threading.Lock()  # Mutex lock for thread safety
+        self._expiry = []  # Min-heap of (deadline, addr); entries superseded by a later heartbeat are skipped
 
     def start(self):
-        """Starts the master node, listens for incoming connections, and handles slaves."""
+        """Starts the master node event loop, multiplexing every slave on one selectors.DefaultSelector (epoll on Linux)."""
+        def selector_loop():
+            return asyncio.SelectorEventLoop(selectors.DefaultSelector())
+
+        if self.cpu is not None:
+            os.sched_setaffinity(0, {self.cpu})  # Keep the event loop thread, and its cache, on one CPU
+
+        with asyncio.Runner(loop_factory=selector_loop) as runner:
+            runner.run(self.serve())
+
+    async def serve(self):
+        """Listens for incoming connections and handles slaves."""
         context = create_ssl_context(server=True)
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server_socket:
-            server_socket.bind((self.host, self.port))
-            server_socket.listen(5)  # Listen for up to 5 connections
-            print(f"Master Node listening on {self.host}:{self.port}")
-
-            with context.wrap_socket(server_socket, server_side=True) as secure_socket:
-                while True:
-                    client_socket, addr = secure_socket.accept()
-                    print(f"Slave connected: {addr}")
-                    threading.Thread(target=self.handle_slave, args=(client_socket, addr)).start()
-
-    def handle_slave(self, client_socket, addr):
+        server = await asyncio.start_server(self.handle_slave, self.host, self.port, ssl=context, backlog=5)
+        logger.info("Master Node listening on %s:%s", self.host, self.port)
+
+        monitor = asyncio.create_task(self.monitor_slaves())  # Keep a reference so the task is not collected
+        async with server:
+            await server.serve_forever()
+
+    async def handle_slave(self, reader, writer):
         """Handles communication with a connected slave node."""
-        with client_socket:
+        addr = writer.get_extra_info("peername")
+        if self.cpu is not None and hasattr(socket, "SO_INCOMING_CPU"):
+            # Report where the kernel processed this slave's packets so far; this is read-only
+            # information for an established socket and does not steer packet processing
+            incoming_cpu = writer.get_extra_info("socket").getsockopt(socket.SOL_SOCKET, socket.SO_INCOMING_CPU)
+            logger.debug("Slave %s packets processed on CPU %s (event loop on CPU %s)", addr, incoming_cpu, self.cpu)
+        tls_stats = create_ssl_context(server=True).session_stats()
+        logger.info("Slave connected: %s (TLS handshakes: %s, resumed: %s)", addr, tls_stats["accept_good"], tls_stats["hits"])
+        buffer = bytearray()  # Reused across reads; holds any trailing partial message
+        try:
             while True:
-                try:
-                    data = client_socket.recv(1024).decode()
-                    if not data:
-                        break
-
-                    if data.startswith("HEARTBEAT"):
-                        # Update last heartbeat time for the slave
-                        with self.lock:
-                            self.slaves[addr] = time.time()
-                        print(f"Heartbeat received from {addr}")
-
-                    elif data.startswith("RESOURCE"):
-                        # Handle resource data received from the slave
-                        resource_data = data.split(" ", 1)[1]
-                        print(f"Resource data from {addr}: {resource_data}")
-                except (ConnectionResetError, ssl.SSLError):
-                    print(f"Connection lost with {addr}")
-                    break
-
-        # Remove the slave from the tracking list upon disconnection
-        with self.lock:
-            if addr in self.slaves:
-                del self.slaves[addr]
-
-    def monitor_slaves(self):
+                data = await reader.read(TLS_RECORD_SIZE)
+                if not data:
+                    break  # Slave closed the connection
+                buffer += data
+
+                # A single read may carry several fixed-size frames
+                complete = len(buffer) - len(buffer) % FRAME.size
+                for offset in range(0, complete, FRAME.size):
+                    tag, cpu, memory, seq = FRAME.unpack_from(buffer, offset)
+                    if tag == TAG_HB_RES:
+                        # Update last heartbeat time for the slave and schedule its deadline
+                        now = time.time()
+                        self.slaves[addr] = now
+                        heapq.heappush(self._expiry, (now + HEARTBEAT_TIMEOUT, addr))
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("Heartbeat received from %s", addr)
+                            logger.debug("Resource data from %s: CPU: %s%%, Memory: %s%% (seq %s)", addr, cpu, memory, seq)
+                del buffer[:complete]  # Drop consumed frames, keep the partial tail
+        except (ConnectionResetError, ssl.SSLError):
+            logger.warning("Connection lost with %s", addr)
+        finally:
+            writer.close()
+            # Remove the slave from the tracking list upon disconnection
+            self.slaves.pop(addr, None)
+
+    async def monitor_slaves(self):
         """Monitors slaves to check for inactive or unresponsive nodes."""
         while True:
-            with self.lock:
-                now = time.time()
-                for addr, last_heartbeat in list(self.slaves.items()):
-                    if now - last_heartbeat > 10:  # If no heartbeat for 10 seconds, mark as unresponsive
-                        print(f"Slave {addr} is unresponsive")
-                        del self.slaves[addr]
-            time.sleep(5)  # Check every 5 seconds
+            now = time.time()
+            while self._expiry and self._expiry[0][0] <= now:
+                deadline, addr = heapq.heappop(self._expiry)
+                last_heartbeat = self.slaves.get(addr)
+                # Only act if no heartbeat arrived after the one that set this deadline
+                if last_heartbeat is not None and last_heartbeat + HEARTBEAT_TIMEOUT <= deadline:
+                    logger.warning("Slave %s is unresponsive", addr)
+                    del self.slaves[addr]
+            # Sleep until the earliest deadline; new heartbeats always expire later than that
+            delay = self._expiry[0][0] - now if self._expiry else HEARTBEAT_TIMEOUT
+            await asyncio.sleep(delay)
+
+# Coalescing Writer
+class CoalescingWriter:
+    """
+    Buffers small writes and sends them with a single sendall, either when
+    FLUSH_THRESHOLD bytes are pending or FLUSH_INTERVAL seconds after the first pending write.
+    on_error(error) is called from the flusher thread as soon as a background send fails.
+    """
+    def __init__(self, sock, on_error=None):
+        self.sock = sock
+        self.on_error = on_error
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        self._pending = threading.Event()  # Set while the buffer holds unsent data
+        self._error = None  # Send error raised by the flusher thread, also re-raised by the next write
+        threading.Thread(target=self._flush_when_due, daemon=True).start()
+
+    def write(self, data):
+        """Queues data for sending, flushing at once if the buffer reaches FLUSH_THRESHOLD."""
+        if self._error is not None:
+            raise self._error
+        with self._lock:
+            self._buffer += data
+            if len(self._buffer) >= FLUSH_THRESHOLD:
+                self._flush_locked()
+            else:
+                self._pending.set()
+
+    def flush(self):
+        """Sends any buffered data immediately."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._buffer:
+            self.sock.sendall(self._buffer)
+            self._buffer.clear()
+        self._pending.clear()
+
+    def _flush_when_due(self):
+        """Sleeps until data is pending, then flushes it after FLUSH_INTERVAL seconds."""
+        while self._error is None:
+            self._pending.wait()
+            time.sleep(FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except OSError as error:  # Includes ssl.SSLError, BrokenPipeError and ConnectionResetError
+                self._error = error
+                if self.on_error is not None:
+                    self.on_error(error)
 
 # Slave Node Class
 class SlaveNode:
     def __init__(self, master_host, master_port):
         self.master_host = master_host
         self.master_port = master_port
+        self._shutdown = threading.Event()  # Set to stop the slave
+        # Latest (cpu, memory) percentages, replaced as a whole by the sampler thread
+        self._resources = None
+        self._sampled = threading.Event()  # Set once the first full sample is available
 
     def start(self):
         """Connects to the master node and sends periodic heartbeats and resource status."""
         context = create_ssl_context(server=False)
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as slave_socket:
+            slave_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # Coalescing is done by CoalescingWriter
             with context.wrap_socket(slave_socket, server_hostname=self.master_host) as secure_socket:
                 secure_socket.connect((self.master_host, self.master_port))
 
-                # Start separate threads for sending heartbeat and resource data
-                threading.Thread(target=self.send_heartbeat, args=(secure_socket,), daemon=True).start()
-                threading.Thread(target=self.send_resource_status, args=(secure_socket,), daemon=True).start()
+                # Sample resource usage in the background so sends never touch /proc
+                threading.Thread(target=self._sample_resources, daemon=True).start()
+                # Start a single thread that sends heartbeat and resource data together
+                threading.Thread(target=self._pulse, args=(secure_socket,), daemon=True).start()
+                # Notice a closed master right away instead of at the next failing send (Linux only)
+                if hasattr(select, "POLLRDHUP"):
+                    threading.Thread(target=self._watch_master, args=(secure_socket,), daemon=True).start()
 
-                # Keep the connection alive
-                while True:
-                    try:
-                        time.sleep(1)
-                    except KeyboardInterrupt:
-                        print("Slave shutting down...")
-                        break
+                # Keep the connection alive until shutdown is requested
+                try:
+                    self._shutdown.wait()
+                except KeyboardInterrupt:
+                    self._shutdown.set()
+                logger.info("Slave shutting down...")
 
-    def send_heartbeat(self, secure_socket):
-        """Sends a heartbeat message to the master node every 5 seconds."""
-        while True:
-            try:
-                secure_socket.sendall(b"HEARTBEAT")
-                time.sleep(5)
-            except (ssl.SSLError, BrokenPipeError):
-                print("Error sending heartbeat. Reconnecting...")
-                break
+    def _sample_resources(self):
+        """Refreshes the (cpu, memory) snapshot every RESOURCE_SAMPLE_INTERVAL seconds."""
+        while not self._shutdown.is_set():
+            cpu = psutil.cpu_percent(interval=RESOURCE_SAMPLE_INTERVAL)  # Blocks for the interval
+            self._resources = (cpu, psutil.virtual_memory().percent)  # Single assignment, read atomically
+            self._sampled.set()
 
-    def send_resource_status(self, secure_socket):
-        """Sends CPU and memory usage data to the master node every 10 seconds."""
-        while True:
+    def _send_failed(self, error):
+        """Shuts the slave down after a terminal send error, from whichever thread hit it."""
+        logger.error("Error sending heartbeat (%s). Shutting down...", error)
+        self._shutdown.set()
+
+    def _watch_master(self, secure_socket):
+        """Waits for the master to close the connection, or for the connection to fail."""
+        poller = select.poll()
+        # POLLRDHUP ignores incoming TLS records (e.g. session tickets) and polling never touches the TLS state
+        poller.register(secure_socket, select.POLLRDHUP)
+        poller.poll()  # POLLHUP and POLLERR are always reported as well
+        if not self._shutdown.is_set():
+            logger.error("Master closed the connection. Shutting down...")
+            self._shutdown.set()
+
+    def _pulse(self, secure_socket):
+        """Sends a heartbeat frame carrying resource status every 5 seconds."""
+        writer = CoalescingWriter(secure_socket, on_error=self._send_failed)
+        seq = 0
+        self._sampled.wait()  # A first non-blocking cpu_percent() reading would always be 0.0
+        while not self._shutdown.is_set():
             try:
-                cpu = psutil.cpu_percent()
-                memory = psutil.virtual_memory().percent
-                resource_data = f"CPU: {cpu}%, Memory: {memory}%"
-                secure_socket.sendall(f"RESOURCE {resource_data}".encode())
-                time.sleep(10)
-            except (ssl.SSLError, BrokenPipeError):
-                print("Error sending resource status. Reconnecting...")
+                cpu, memory = self._resources
+                writer.write(FRAME.pack(TAG_HB_RES, round(cpu), round(memory), seq))
+                seq = (seq + 1) % 256
+            except OSError as error:  # Any send failure (ssl.SSLError, BrokenPipeError, ConnectionResetError, ...) is terminal
+                self._send_failed(error)
                 break
+            self._shutdown.wait(5)  # Returns early if the flusher thread reports a failure
 
 # Main Execution
 if __name__ == "__main__":
-    import sys
-
     if len(sys.argv) < 2:
         print("Usage: python script.py [master|slave]")
         sys.exit(1)
 
+    setup_logging()
+
     if sys.argv[1] == "master":
         master = MasterNode("127.0.0.1", 8000)  # Bind master node to all interfaces on port 8000
-        threading.Thread(target=master.monitor_slaves, daemon=True).start()
         master.start()
 
     elif sys.argv[1] == "slave":
@@ -1,96 +1,259 @@
 #!/usr/bin/env python
 # ipc_socket_server.py
+# Requires msgpack-rpc-python (pip install msgpack-rpc-python) for the RPC call made by the
+# message processor; it is imported there, so the rest of the module works without it.
+import atexit
+import contextlib
+import logging
+import logging.handlers
+import queue
 import socket
+import struct
+import sys
+import threading
 import multiprocessing
+from multiprocessing import shared_memory
 import time
-import xmlrpc.client
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+RPC_HOST = "localhost"
+RPC_PORT = 8000
+HANDLER_THREADS = 32  # Client connections served concurrently
+RING_SIZE = 1 << 20  # Bytes of shared memory used for queued messages
+RECORD_HEADER = struct.Struct("<I")  # Length prefix of each message record
+SHUTDOWN = ""  # Empty record telling the processor to exit; clients never send empty messages
+
+# --- Logging ---
+def setup_logging(level=logging.INFO):
+    """
+    Routes log records through a queue to a listener thread that writes them to stdout,
+    so handler threads never serialize on the stdout lock. Called once per process.
+    """
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+    listener.start()
+    atexit.register(listener.stop)  # Flush queued records on exit
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(level)
+    return listener
+
+# --- Shared-Memory Message Ring (IPC) ---
+class MessageRing:
+    """
+    Single-consumer ring buffer in shared memory carrying length-prefixed UTF-8 messages.
+    Messages are copied straight into shared memory instead of being pickled through a pipe.
+    head and tail are running byte counts; the consumer is woken through a semaphore
+    only when it had already consumed everything before the record just published.
+    The ring can be passed to a Process under any start method; build it with the same
+    multiprocessing context that starts the consumer.
+    """
+    def __init__(self, size=RING_SIZE, context=None):
+        context = context or multiprocessing.get_context()
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.size = size
+        self.head = context.RawValue("Q", 0)  # Advanced by the consumer
+        self.tail = context.RawValue("Q", 0)  # Advanced by the producer
+        self.wake = context.Semaphore(0)  # Released by the producer to wake a waiting consumer
+        self.producer_lock = threading.Lock()  # Serializes producer threads within the server process
+
+    def __getstate__(self):
+        # Thread locks cannot be pickled (spawn/forkserver); the consumer process never produces anyway
+        state = self.__dict__.copy()
+        del state["producer_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.producer_lock = threading.Lock()
+
+    def send(self, message):
+        """Appends a message to the ring, waiting for space if the consumer is behind."""
+        data = message.encode()
+        record = RECORD_HEADER.pack(len(data)) + data
+        if len(record) > self.size:
+            raise ValueError("Message too large for the ring")
+        with self.producer_lock:
+            while self.size - (self.tail.value - self.head.value) < len(record):
+                time.sleep(0.001)  # Ring full; let the consumer catch up
+            old_tail = self.tail.value
+            self._write(old_tail, record)
+            self.tail.value = old_tail + len(record)  # Publish the record before checking the consumer
+            # Re-read head only after publishing: if the consumer had drained the ring it may be
+            # blocked (or about to block) on the semaphore and would never see this record
+            if self.head.value == old_tail:
+                self.wake.release()  # Wake the consumer
+
+    def recv(self):
+        """Removes and returns the next message, blocking while the ring is empty."""
+        while self.head.value == self.tail.value:
+            self.wake.acquire()
+            while self.wake.acquire(block=False):
+                pass  # Drain wake-ups left over from records already consumed
+        head = self.head.value
+        (length,) = RECORD_HEADER.unpack(self._read(head, RECORD_HEADER.size))
+        data = self._read(head + RECORD_HEADER.size, length)
+        self.head.value = head + RECORD_HEADER.size + length
+        return data.decode()
+
+    def close(self):
+        """Releases the shared memory."""
+        self.shm.close()
+        self.shm.unlink()
+
+    def _write(self, position, data):
+        start = position % self.size
+        first = min(len(data), self.size - start)
+        self.shm.buf[start:start + first] = data[:first]
+        self.shm.buf[:len(data) - first] = data[first:]  # Wrap around to the start of the ring
+
+    def _read(self, position, length):
+        start = position % self.size
+        first = min(length, self.size - start)
+        return bytes(self.shm.buf[start:start + first]) + bytes(self.shm.buf[:length - first])
 
 # --- Message Processor (Consumer) ---
-def message_reading_process(pipe_read_end):
+def message_reading_process(ring):
     """
-    Reads messages from the pipe, processes them (e.g., converts to uppercase and adds timestamp),
+    Reads messages from the shared-memory ring, processes them (e.g., converts to uppercase and adds timestamp),
     then calls the RPC service for additional processing.
+    The RPC client keeps its TCP connection open across messages; after a failed call it is
+    discarded and a new one is connected for the next message, so a restarted RPC server is picked up.
     """
-    rpc_client = xmlrpc.client.ServerProxy("http://localhost:8000/", allow_none=True)
+    import msgpackrpc  # Only the processor talks to the RPC server
+
+    listener = setup_logging()  # The listener thread of the parent does not survive the fork
+    rpc_client = None
     
     while True:
-        message = pipe_read_end.recv()  # Blocking call to receive a message from the producer
-        if message == "QUIT":
-            print("Processor: Shutting down.")
+        message = ring.recv()  # Blocking call to receive a message from the producer
+        if message == SHUTDOWN:
+            logger.info("Processor: Shutting down.")
             break
 
         # Local processing: uppercase conversion and adding a timestamp
         processed_message = f"{time.strftime('%Y-%m-%d %H:%M:%S')} - {message.upper()}"
-        print(f"Processor: Processed message: {processed_message}")
+        logger.debug("Processor: Processed message: %s", processed_message)
 
         # Send the processed message to the RPC service
         try:
-            rpc_response = rpc_client.process_client_message(processed_message)
-            print(f"Processor: RPC response: {rpc_response}")
+            if rpc_client is None:
+                rpc_client = msgpackrpc.Client(msgpackrpc.Address(RPC_HOST, RPC_PORT), unpack_encoding="utf-8")
+            rpc_response = rpc_client.call("process_client_message", processed_message)
+            logger.debug("Processor: RPC response: %s", rpc_response)
         except Exception as error:
-            print(f"Processor: RPC call failed: {error}")
+            logger.error("Processor: RPC call failed: %s", error)
+            if rpc_client is not None:
+                with contextlib.suppress(Exception):  # The connection may already be unusable
+                    rpc_client.close()
+                rpc_client = None  # Reconnect on the next message
+
+    listener.stop()  # Flush queued records before the process exits
+    atexit.unregister(listener.stop)  # Spawned processes run atexit hooks; stopping twice raises
 
 # --- Client Connection Handler (Producer) ---
-def handle_client(client_socket, pipe_write_end):
+def handle_client(client_socket, ring):
     """
-    Handles client connection: receives data via socket,
-    and sends it through the IPC pipe for processing.
+    Handles client connection: receives newline-terminated messages via socket,
+    and sends each through the IPC ring for processing.
+    A single recv may carry several messages when the client pipelines its sends.
     """
+    buffer = bytearray(1024)  # Reused for every recv on this connection
+    pending = bytearray()  # Received bytes not yet terminated by a newline
+    connected = True
     with client_socket:
-        print("Handler: Client connected.")
-        while True:
-            data = client_socket.recv(1024)
-            if not data:
+        logger.info("Handler: Client connected.")
+        while connected:
+            received = client_socket.recv_into(buffer)
+            if not received:
                 break  # Client disconnected
             
-            message = data.decode().strip()
-            if message.lower() == "exit":
-                pipe_write_end.send("QUIT")  # Signal message_reading_process to exit
-                print("Handler: Received shutdown command from client.")
-                break
-            
-            print(f"Handler: Received message: {message}")
-            pipe_write_end.send(message)  # Send message to message_reading_process via IPC
-            client_socket.sendall("Message received and is being processed.\n".encode())
-    print("Handler: Client disconnected.")
+            pending += memoryview(buffer)[:received]
+            *lines, partial = pending.split(b"\n")
+            pending[:] = partial
+            for line in lines:
+                message = line.decode().strip()
+                if not message:
+                    # Blank lines are not forwarded (an empty record means SHUTDOWN to the processor),
+                    # but clients still expect one acknowledgment per line
+                    client_socket.sendall("Empty message ignored.\n".encode())
+                    continue
+                if message.lower() == "exit":
+                    ring.send(SHUTDOWN)  # Signal message_reading_process to exit
+                    logger.info("Handler: Received shutdown command from client.")
+                    connected = False
+                    break
+                
+                logger.debug("Handler: Received message: %s", message)
+                ring.send(message)  # Send message to message_reading_process via IPC
+                client_socket.sendall("Message received and is being processed.\n".encode())
+    logger.info("Handler: Client disconnected.")
+
+def serve_client(client_socket, client_address, ring, open_clients):
+    """
+    Runs handle_client on a worker thread, logging any failure instead of leaving it
+    unseen in the discarded future, and forgets the socket once the client is done.
+    """
+    try:
+        handle_client(client_socket, ring)
+    except Exception:
+        logger.exception("Handler: Client %s failed.", client_address)
+    finally:
+        open_clients.discard(client_socket)
 
 # --- TCP Server ---
-def start_tcp_server(pipe_write_end):
+def start_tcp_server(ring):
     """
     Initializes and runs the TCP socket server.
-    Handles each client connection by delegating it to a handler.
+    Handles each client connection by delegating it to a handler on a worker thread,
+    so the accept loop is free to take the next connection immediately.
     """
     server_host = "localhost"
     server_port = 12345
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     server_socket.bind((server_host, server_port))
-    server_socket.listen(5)
-    print(f"Server: Listening on {server_host}:{server_port}...")
+    server_socket.listen(1024)
+    logger.info("Server: Listening on %s:%s...", server_host, server_port)
 
-    while True:
-        client_socket, client_address = server_socket.accept()
-        print(f"Server: Connection from {client_address}")
-        handle_client(client_socket, pipe_write_end)
-    
-    server_socket.close()
+    handler_pool = ThreadPoolExecutor(max_workers=HANDLER_THREADS)
+    open_clients = set()  # Sockets of connected clients, shut down when the server stops
+    try:
+        while True:
+            client_socket, client_address = server_socket.accept()
+            logger.info("Server: Connection from %s", client_address)
+            open_clients.add(client_socket)
+            handler_pool.submit(serve_client, client_socket, client_address, ring, open_clients)
+    finally:
+        # Worker threads are joined at interpreter exit, so wake every handler blocked in recv_into
+        for client_socket in list(open_clients):
+            with contextlib.suppress(OSError):  # Already closed by its handler
+                client_socket.shutdown(socket.SHUT_RDWR)
+        handler_pool.shutdown(wait=False, cancel_futures=True)
+        server_socket.close()
 
 # --- Main Entry Point ---
 def main():
     """
     Sets up IPC and starts the message message_reading_process and TCP server.
     """
-    pipe_write_end, pipe_read_end = multiprocessing.Pipe()
+    setup_logging()
+    context = multiprocessing.get_context()  # The ring and its consumer must share a start method
+    ring = MessageRing(context=context)
     
-    message_reader_process = multiprocessing.Process(target=message_reading_process, args=(pipe_read_end,))
+    message_reader_process = context.Process(target=message_reading_process, args=(ring,))
     message_reader_process.start()
     
     try:
-        start_tcp_server(pipe_write_end)
+        start_tcp_server(ring)
     except KeyboardInterrupt:
-        print("Server: Shutting down.")
+        logger.info("Server: Shutting down.")
     finally:
-        pipe_write_end.send("QUIT")
+        ring.send(SHUTDOWN)
         message_reader_process.join()
+        ring.close()
 
 if __name__ == "__main__":
     main()
@@ -1,34 +1,43 @@
 #!/usr/bin/env python 
-# xmlrpc_message_server.py
+# msgpackrpc_message_server.py
+# Requires msgpack-rpc-python (pip install msgpack-rpc-python)
 
-from xmlrpc.server import SimpleXMLRPCServer
+import msgpackrpc
 
 # --- Function to Process Client Messages ---
 def process_client_message(client_message):
     """
     Processes a message received from the client.
     For demonstration, appends a note and returns the modified message.
-    This function runs in the same process as the XML-RPC server.
+    This function runs in the same process as the msgpack-RPC server.
     """
     print("Received message: ", client_message)  # Log received message
     return f"{client_message} [Processed by RPC Server]"
 
-# --- Function to Start the XML-RPC Server ---
+# --- RPC Handler ---
+class MessageHandler:
+    """
+    Exposes remote procedures to msgpack-RPC clients.
+    Each public method is callable by name from the client.
+    """
+    def process_client_message(self, client_message):
+        return process_client_message(client_message)
+
+# --- Function to Start the msgpack-RPC Server ---
 def start_rpc_server():
     """
-    Initializes and starts the XML-RPC server to handle remote function calls.
-    The server listens on localhost:8000 and handles one request at a time.
+    Initializes and starts the msgpack-RPC server to handle remote function calls.
+    The server listens on localhost:8000 and keeps client connections open,
+    so a single TCP connection is reused for every call.
     """
-    rpc_server = SimpleXMLRPCServer(("localhost", 8000), logRequests=True, allow_none=True)
-    print("XML-RPC Server is running on port 8000...")
-    
-    # Register the process_client_message function as a remote procedure
-    rpc_server.register_function(process_client_message, "process_client_message")
+    rpc_server = msgpackrpc.Server(MessageHandler(), unpack_encoding="utf-8")
+    rpc_server.listen(msgpackrpc.Address("localhost", 8000))
+    print("msgpack-RPC Server is running on port 8000...")
     
     # Keep the server running indefinitely to handle incoming requests
-    rpc_server.serve_forever()
+    rpc_server.start()
 
 # --- Entry Point ---
 if __name__ == "__main__":
-    start_rpc_server()  # Start the XML-RPC server
+    start_rpc_server()  # Start the msgpack-RPC server
 
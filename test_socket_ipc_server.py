@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# test_socket_ipc_server.py
+import multiprocessing
+import queue
+import threading
+import time
+import unittest
+
+from socket_ipc_server import SHUTDOWN, MessageRing
+
+class SlowMessageRing(MessageRing):
+    """MessageRing whose copies are slow, as if either side lost the CPU mid-copy."""
+    def _write(self, position, data):
+        time.sleep(0.02)
+        super()._write(position, data)
+
+    def _read(self, position, length):
+        time.sleep(0.005)  # Consumer still holds the previous record while the producer starts the next
+        return super()._read(position, length)
+
+def send_messages(ring, messages):
+    """Producer: sends every message followed by SHUTDOWN."""
+    for message in messages:
+        ring.send(message)
+    ring.send(SHUTDOWN)
+
+def collect_messages(ring, results):
+    """Consumer: reads messages until SHUTDOWN and reports them back."""
+    received = []
+    while (message := ring.recv()) != SHUTDOWN:
+        received.append(message)
+    results.put(received)
+
+class MessageRingTest(unittest.TestCase):
+    def assert_delivered(self, ring_class, size, messages):
+        """Checks that a consumer receives every message under each available start method."""
+        for method in multiprocessing.get_all_start_methods():
+            with self.subTest(start_method=method):
+                context = multiprocessing.get_context(method)
+                received = self.deliver_with(context, ring_class(size=size, context=context), messages)
+                self.assertEqual(received, messages)
+
+    def deliver_with(self, context, ring, messages):
+        results = context.Queue()
+        consumer = context.Process(target=collect_messages, args=(ring, results))
+        consumer.start()
+        # Send from a daemon thread: if a wake-up is lost the producer blocks on a full ring
+        sender = threading.Thread(target=send_messages, args=(ring, messages), daemon=True)
+        sender.start()
+        try:
+            try:
+                received = results.get(timeout=10)  # Read before join so the child can flush its result
+            except queue.Empty:
+                self.fail("consumer missed a wake-up")
+            consumer.join(timeout=10)
+            return received
+        finally:
+            if consumer.is_alive():
+                consumer.kill()
+            ring.close()
+
+    def test_wraps_around_small_ring(self):
+        messages = [f"message-{i}-" + "x" * (i % 30) for i in range(2000)]
+        self.assert_delivered(MessageRing, 64, messages)
+
+    def test_slow_writer_does_not_lose_wakeup(self):
+        messages = [f"message-{i}" for i in range(30)]
+        self.assert_delivered(SlowMessageRing, 64, messages)
+
+if __name__ == "__main__":
+    unittest.main()